@@ -3,13 +3,34 @@ import argparse
 import subprocess
 import sys
 import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 
-# Try to import duckdb, and set a flag if it's not available
+# duckdb is imported on first use rather than at startup, since importing it is slow.
+_duckdb = None
+
+def _get_duckdb():
+    """
+    Imports duckdb on first call and caches the result.
+
+    Returns:
+        module: The duckdb module, or False if it isn't installed.
+    """
+    global _duckdb
+    if _duckdb is None:
+        try:
+            import duckdb
+            _duckdb = duckdb
+        except ImportError:
+            _duckdb = False
+    return _duckdb
+
+# Prefer orjson's C parser for catalog.json if installed, otherwise use the stdlib.
 try:
-    import duckdb
-    DUCKDB_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    DUCKDB_AVAILABLE = False
+    ORJSON_AVAILABLE = False
 
 def load_catalog(catalog_path):
     """
@@ -22,8 +43,12 @@ def load_catalog(catalog_path):
         dict: The loaded catalog data, or None if the file doesn't exist or errors.
     """
     try:
-        with open(catalog_path, 'r') as f:
-            catalog_data = json.load(f)
+        with open(catalog_path, 'rb') as f:
+            raw = f.read()
+        if ORJSON_AVAILABLE:
+            catalog_data = orjson.loads(raw)  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        else:
+            catalog_data = json.loads(raw)
         return catalog_data
     except FileNotFoundError:
         print(f"Error: catalog.json file not found at {catalog_path}")
@@ -35,113 +60,348 @@ def load_catalog(catalog_path):
         print(f"Error loading catalog.json: {e}")
         return None
 
-def get_table_info(catalog_data, table_name):
+# Catalog resource types that are queryable tables.
+_TABLE_RESOURCE_TYPES = frozenset(('model', 'seed', 'snapshot', 'table', 'view'))
+
+# Shown for columns without a description in the catalog.
+_NO_DESC = 'No description.'
+
+def index_catalog(catalog_data):
     """
-    Retrieves information about a specific table from the catalog data.
+    Indexes the catalog nodes in a single pass.
 
     Args:
         catalog_data (dict): The loaded catalog data.
+
+    Returns:
+        tuple: (names_list, lower_index) where names_list holds the names of table-like
+            nodes (see _TABLE_RESOURCE_TYPES) and lower_index maps every
+            lowercased node name to its node.  When names collide, the first table-like
+            node wins, falling back to the first node with that name.
+    """
+    names_list = []
+    lower_index = {}
+    if not catalog_data:
+        return names_list, lower_index
+    add_name = names_list.append  # Bound once, not looked up per node.
+    for node in catalog_data['nodes'].values():
+        name = node['name']
+        key = name.lower()
+        is_table = node['resource_type'] in _TABLE_RESOURCE_TYPES
+        # On a name collision keep the first node, unless a table-like node can replace a non-table one.
+        existing = lower_index.get(key)
+        if existing is None or (is_table and existing['resource_type'] not in _TABLE_RESOURCE_TYPES):
+            lower_index[key] = node
+        if is_table:
+            add_name(name)
+    return names_list, lower_index
+
+def get_flat_columns(table_info):
+    """
+    Returns a table's columns as (column_name, dtype, description) tuples for printing.
+
+    The list is built the first time a table is printed and kept on the node as
+    '_cols_flat', so nodes that are never printed cost nothing and a malformed one
+    can't break the run.
+
+    Args:
+        table_info (dict): A catalog node, as returned by get_table_info.
+
+    Returns:
+        list: The (column_name, dtype, description) tuples.
+    """
+    cols_flat = table_info.get('_cols_flat')
+    if cols_flat is None:
+        get = dict.get  # Bound once, not looked up per column.
+        cols_flat = [(column_name, get(column_info, 'dtype', 'unknown'), get(column_info, 'description', _NO_DESC))
+                     for column_name, column_info in table_info.get('columns', {}).items()]
+        table_info['_cols_flat'] = cols_flat
+    return cols_flat
+
+# Bump when the index_catalog output changes so stale cache files are rebuilt.
+_INDEX_CACHE_VERSION = 4
+
+def _cache_is_trusted(cache_stat):
+    """
+    Checks that a cache file belongs to the current user, since unpickling it can run code.
+
+    Args:
+        cache_stat (os.stat_result): The stat of the cache file.
+
+    Returns:
+        bool: True if the file may be loaded.
+    """
+    if not hasattr(os, 'getuid'):
+        return True  # No ownership model to check against (e.g. Windows).
+    return cache_stat.st_uid == os.getuid()
+
+def load_catalog_index(catalog_path):
+    """
+    Loads the catalog index, reusing a pickled copy next to catalog.json when it is up to date.
+
+    The cache is written to catalog_path + '.idx.pkl' and records the mtime (in ns) and
+    size of the catalog.json it was built from; it is only used when both still match
+    exactly.  Loading the cache unpickles it, so the file is trusted: it is only read
+    when owned by the current user.  Failing to read or write it is not an error, the
+    index is just rebuilt from catalog.json.
+
+    Args:
+        catalog_path (str): The path to the catalog.json file.
+
+    Returns:
+        tuple: (names_list, lower_index) as returned by index_catalog, or None if the catalog can't be loaded.
+    """
+    cache_path = catalog_path + '.idx.pkl'
+    try:
+        catalog_stat = os.stat(catalog_path)
+        catalog_key = (catalog_stat.st_mtime_ns, catalog_stat.st_size)
+    except OSError:
+        catalog_key = None  # load_catalog below reports the error.
+
+    if catalog_key is not None:
+        try:
+            if _cache_is_trusted(os.stat(cache_path)):
+                with open(cache_path, 'rb') as f:
+                    version, cached_key, names_list, lower_index = pickle.load(f)
+                if version == _INDEX_CACHE_VERSION and cached_key == catalog_key:
+                    return names_list, lower_index
+        except Exception:
+            pass  # Missing, stale or unreadable cache: rebuild below.
+
+    catalog_data = load_catalog(catalog_path)
+    if not catalog_data:
+        return None
+    names_list, lower_index = index_catalog(catalog_data)
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump((_INDEX_CACHE_VERSION, catalog_key, names_list, lower_index), f, protocol=5)
+    except Exception:
+        pass  # e.g. a read-only target directory; the cache is only an optimisation.
+    return names_list, lower_index
+
+def get_table_info(lower_index, table_name):
+    """
+    Retrieves information about a specific table from the catalog index.
+
+    Args:
+        lower_index (dict): The lowercased name -> node map from index_catalog.
         table_name (str): The name of the table to retrieve information for.
 
     Returns:
         dict: Information about the table, or None if not found.
     """
-    if not catalog_data:
+    if not lower_index:
         return None
+    return lower_index.get(table_name.lower())
 
-    for node in catalog_data['nodes'].values():
-        if node['name'].lower() == table_name.lower():
-            return node
-    return None
+def quote_identifier(name):
+    """
+    Quotes a name for use as a DuckDB identifier.
+
+    Args:
+        name (str): The raw name, e.g. a table name from the LLM's answer.
+
+    Returns:
+        str: The double-quoted identifier, with embedded quotes escaped.
+    """
+    return '"' + name.replace('"', '""') + '"'
 
-def get_table_names(catalog_data):
+def quote_literal(value):
     """
-    Gets all table names from catalog.json
+    Quotes a value for use as a DuckDB string literal.
 
     Args:
-        catalog_data (dict): the loaded catalog data
+        value (str): The raw string, e.g. a path to parquet files.
 
     Returns:
-        list: A list of table names
+        str: The single-quoted literal, with embedded quotes escaped.
     """
-    if not catalog_data:
-        return []
-    table_names = []
-    for node in catalog_data['nodes'].values():
-        if node['resource_type'] in ('model', 'seed', 'snapshot', 'table', 'view'):
-            table_names.append(node['name'])
-    return table_names
+    return "'" + value.replace("'", "''") + "'"
 
-def generate_duckdb_query(table_name, catalog_path):
+def generate_duckdb_query(table_name):
     """
     Generates a DuckDB query to get a sample of data from a table.
 
+    The table must already be registered as a view, see create_view_duckdb.
+
     Args:
         table_name (str): The name of the table.
-        catalog_path (str): the path to catalog.json
 
     Returns:
         str: A DuckDB query, or None if DuckDB is not available.
     """
-    if not DUCKDB_AVAILABLE:
+    if not _get_duckdb():
         return None
-    # catalog_path is used only for error reporting, the actual path is derived in main.
-    return f"SELECT * FROM read_parquet('{table_name}/*.parquet') LIMIT 5" #This will NOT work.  DuckDB needs a path.
+    return f"SELECT * FROM {quote_identifier(table_name)} LIMIT 5"
 
-def get_sample_data_duckdb(table_name, catalog_path):
+def first_nonempty_parquet_file(conn, parquet_files):
     """
-    Retrieves sample data from a table using DuckDB.
+    Finds the first parquet file that contains rows, reading only file footers.
+
+    Files are checked in order and the search stops at the first hit, so usually only
+    one or two footers are read.  Zero-row files such as Spark's empty part files are skipped.
+    It runs from create_view_duckdb inside each fetch_samples_duckdb worker, so the
+    footer reads for different tables overlap.
 
     Args:
-        table_name (str): The name of the table.
-        catalog_path (str): The path to catalog.json
+        conn (duckdb.DuckDBPyConnection): The calling worker's DuckDB cursor.
+        parquet_files (list): Paths to the table's parquet files, in sample order.
 
     Returns:
-        str: A string representation of the sample data, or None on error.
+        str: The first file with rows, or the first file if none have rows or their footers can't be read.
+    """
+    for parquet_file in parquet_files:
+        try:
+            has_rows = conn.execute(f"SELECT 1 FROM parquet_metadata({quote_literal(parquet_file)}) "
+                                    f"WHERE row_group_num_rows > 0 LIMIT 1").fetchone()
+        except Exception:
+            continue  # Unreadable footer; read_parquet will report it if nothing better turns up.
+        if has_rows:
+            return parquet_file
+    return parquet_files[0]
+
+def create_view_duckdb(conn, table_name, data_path):
     """
+    Registers a table's parquet data as a DuckDB view so later queries can refer to it by name.
 
-    if not DUCKDB_AVAILABLE:
-        return "DuckDB is not available. Please install it to use this feature."
+    The parquet files are listed with DuckDB's glob() table function.  The view
+    only covers the table's first parquet file that has rows, found from the
+    file footers (see first_nonempty_parquet_file).  It's used for a 5 row sample, so
+    there's no need for DuckDB to open every file in a partitioned table.
+    Schema unification and hive partition detection are turned off for the same reason.
 
-    query = generate_duckdb_query(table_name, catalog_path)
-    if query is None:
-        return "DuckDB query generation failed."
+    Args:
+        conn (duckdb.DuckDBPyConnection): The calling worker's DuckDB cursor.
+        table_name (str): The name of the table.  Parquet files are read from data_path/table_name/.
+        data_path (str): The path to the data files.
+
+    Returns:
+        str: An error message, or None if the view was created.
+    """
+    # Listed through DuckDB so remote paths (s3://, gs://, https://) work like local ones.
+    parquet_glob = data_path.rstrip('/') + '/' + table_name + '/*.parquet'
+    try:
+        parquet_files = [row[0] for row in conn.execute(
+            f"SELECT file FROM glob({quote_literal(parquet_glob)}) ORDER BY file").fetchall()]
+    except Exception as e:
+        return f"Error listing {parquet_glob} with DuckDB: {e}"
+    if not parquet_files:
+        return f"No parquet files found at {parquet_glob}"
+    parquet_file = first_nonempty_parquet_file(conn, parquet_files)
+    try:
+        conn.execute(f"CREATE OR REPLACE VIEW {quote_identifier(table_name)} AS "
+                     f"SELECT * FROM read_parquet({quote_literal(parquet_file)}, "
+                     f"union_by_name=false, hive_partitioning=false)")
+        return None
+    except Exception as e:
+        return f"Error registering {parquet_file} with DuckDB: {e}"
 
+# Settings applied to the shared connection.  The object cache keeps parquet metadata
+# between queries on the same files, and none of our queries depend on row order.
+DUCKDB_SETTINGS = (
+    f"SET threads={os.cpu_count() or 1}",
+    "SET enable_object_cache=true",
+    "SET preserve_insertion_order=false",
+)
+
+def open_duckdb_connection():
+    """
+    Opens the in-memory DuckDB connection shared by all queries in a run.
+
+    DUCKDB_SETTINGS are applied on a best-effort basis, since older or newer DuckDB
+    versions may not know every setting.
+
+    Returns:
+        duckdb.DuckDBPyConnection: The connection, or None if DuckDB is not available or fails to open.
+    """
+    duckdb = _get_duckdb()
+    if not duckdb:
+        return None
     try:
         conn = duckdb.connect(':memory:')  # In-memory database for safety
-        # This is the critical change:  We need the folder where the parquets are, not the catalog.
-        #  The user will need to provide this.  dbt does NOT put the data into catalog.json
-        #  We will ask the user for the path.  For now, we assume a relative path.
-        result = conn.execute(query).fetchdf()
-        conn.close()
-        return result.head().to_string() # consistent
     except Exception as e:
-        return f"Error retrieving sample data with DuckDB: {e}"
+        print(f"Error opening DuckDB connection: {e}")
+        return None
+    for setting in DUCKDB_SETTINGS:
+        try:
+            conn.execute(setting)
+        except Exception:
+            pass  # Tuning only, the defaults still work.
+    return conn
+
+def format_rows(columns, rows):
+    """
+    Formats query results as a plain text table.
 
-def get_table_schema_duckdb(table_name, catalog_path):
+    Args:
+        columns (list): The column names.
+        rows (list): The result rows as tuples, e.g. from fetchall().
+
+    Returns:
+        str: The header and rows with each column padded to a common width.
     """
-    Retrieves the schema of a table using DuckDB.
+    cells = [[str(name) for name in columns]] + [[str(value) for value in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in cells)
+
+def get_sample_data_duckdb(conn, table_name):
+    """
+    Retrieves sample data from a table using DuckDB.
 
     Args:
-        table_name (str): The name of the table.
-        catalog_path (str): The path to catalog.json
+        conn (duckdb.DuckDBPyConnection): The open DuckDB connection, or None.
+        table_name (str): The name of the table, already registered with create_view_duckdb.
 
     Returns:
-        str: A string representation of the table schema, or None if DuckDB is not available.
+        str: A string representation of the sample data, or an error message.
     """
-    if not DUCKDB_AVAILABLE:
+    if conn is None:
         return "DuckDB is not available. Please install it to use this feature."
 
-    query = generate_duckdb_query(table_name, catalog_path) # re-use, it's simpler.
+    query = generate_duckdb_query(table_name)
     if query is None:
         return "DuckDB query generation failed."
+
     try:
-        conn = duckdb.connect(':memory:')
-        result = conn.execute(f"DESCRIBE {query}").fetchdf() # describe the result of the select
-        conn.close()
-        return result.to_string()
+        rel = conn.sql(query)
+        return format_rows(rel.columns, rel.fetchall())  # No DataFrame needed for 5 rows.
     except Exception as e:
-        return f"Error retrieving table schema with DuckDB: {e}"
+        return f"Error retrieving sample data with DuckDB: {e}"
+
+def fetch_samples_duckdb(conn, table_names, data_path):
+    """
+    Retrieves sample data for several tables concurrently.
+
+    Each worker opens its own cursor on the shared in-memory database, since DuckDB
+    connections are not safe to share between threads.  It registers the table as a
+    view over its parquet files on that cursor and then reads the sample, so the
+    file listing and footer reads run in parallel too.
+
+    Args:
+        conn (duckdb.DuckDBPyConnection): The open DuckDB connection, or None.
+        table_names (list): The names of the tables to query.
+        data_path (str): The path to the data files.
+
+    Returns:
+        dict: Table name -> sample data string as returned by get_sample_data_duckdb,
+            or the error from create_view_duckdb.
+    """
+    if conn is None or not table_names:
+        return {name: get_sample_data_duckdb(conn, name) for name in table_names}
+
+    def worker(table_name):
+        cursor = conn.cursor()
+        try:
+            # The dbt catalog doesn't know where the data lives, so the parquet folder comes from --data-path.
+            error = create_view_duckdb(cursor, table_name, data_path)
+            if error:
+                return error
+            return get_sample_data_duckdb(cursor, table_name)
+        finally:
+            cursor.close()
+
+    with ThreadPoolExecutor(max_workers=min(8, len(table_names))) as executor:
+        return dict(zip(table_names, executor.map(worker, table_names)))
 
 def main():
     """
@@ -162,12 +422,11 @@ def main():
     api_key = args.api_key
     data_path = args.data_path # Get the data path.
 
-    catalog_data = load_catalog(catalog_path)
-    if not catalog_data:
+    # 1. Get list of tables, and index the nodes once for the lookups below.
+    catalog_index = load_catalog_index(catalog_path)
+    if not catalog_index:
         sys.exit(1)  # Exit if catalog.json is not loaded
-
-    # 1. Get list of tables.
-    table_names = get_table_names(catalog_data)
+    table_names, lower_index = catalog_index
 
     # 2.  Find tables related to the question.  (LLM)
     if llm_choice == "openai":
@@ -195,28 +454,43 @@ def main():
 
     print(llm_response) # print what the LLM said.
 
+    related_tables = list(dict.fromkeys(related_tables))  # Drop repeats, keep the LLM's order.
+
+    # Query all the known tables up front; the output below stays in related_tables order.
+    # related_tables comes from the LLM, so only table-like catalog nodes reach DuckDB, and
+    # under the catalog's own spelling rather than whatever casing the LLM used.
+    found_tables = []
     for table_name in related_tables:
-        table_info = get_table_info(catalog_data, table_name)
+        table_info = get_table_info(lower_index, table_name)
+        if table_info and table_info['resource_type'] in _TABLE_RESOURCE_TYPES:
+            found_tables.append(table_info['name'])
+    found_tables = list(dict.fromkeys(found_tables))  # Different casings can resolve to one table.
+
+    conn = open_duckdb_connection() if found_tables else None  # One connection for every table below.
+    samples = fetch_samples_duckdb(conn, found_tables, data_path)
+
+    for table_name in related_tables:
+        table_info = get_table_info(lower_index, table_name)
         if table_info:
-            print(f"\nTable: {table_name}")
-            print(f"  Description: {table_info.get('description', 'No description available.')}")
-            print(f"  Columns:")
-            for column_name, column_info in table_info['columns'].items():
-                print(f"    {column_name}: {column_info['dtype']} - {column_info.get('description', 'No description.')}")
-
-            # Get sample data and schema using DuckDB
-            sample_data = get_sample_data_duckdb(table_name, data_path) # Pass the data path
+            # Collect the whole table's output and write it in one call.
+            out = [f"\nTable: {table_name}",
+                   f"  Description: {table_info.get('description', 'No description available.')}",
+                   "  Columns:"]
+            out.extend(f"    {column_name}: {dtype} - {description}"
+                       for column_name, dtype, description in get_flat_columns(table_info))
+
+            # Get sample data using DuckDB.  The schema is the column list above, straight from the catalog.
+            sample_data = samples.get(table_info['name'])
             if sample_data:
-                print("\n  Sample Data (DuckDB):")
-                print(sample_data)
-
-            table_schema = get_table_schema_duckdb(table_name, data_path) # Pass the data path
-            if table_schema:
-                print("\n  Table Schema (DuckDB):")
-                print(table_schema)
+                out.append("\n  Sample Data (DuckDB):")
+                out.append(sample_data)
+            sys.stdout.write("\n".join(out) + "\n")
         else:
             print(f"Table '{table_name}' not found in catalog.")
 
+    if conn is not None:
+        conn.close()
+
     # 3. Ask LLM for query advice.
     if llm_choice == "openai":
         print("Calling OpenAI for query advice...")